@@ -1,269 +1,545 @@
-import random
-from siphash import SipHash, print_hex
-
-class HashTableEntry:
-	''' Class to represent an entry in hash table internal list '''
-	__siphash = SipHash(allow_negative=True, secret_key=None)
-	hash_compress_bits = 0
-
-	def __init__(self, key=None, value=None, hash_value=None):
-		self.__key = key
-		self.__value = value
-		self.__hash_value = None if key is None else self.__get_hash(key)
-		self.__dummy = False
-
-	def __eq__(self, other):
-		if self.__hash_value != other.__hash_value:
-			return False
-		return self.__key == other.__key
-
-	def set_dummy(self):
-		''' Set the entry to dummy to indicate it is deleted from the hash table '''
-		self.__dummy = True
-
-	@property
-	def __state(self):
-		'''
-		Get the state of the entry
-			-1: dummy
-			 0: empty
-			 1: filled
-		'''
-		if self.__dummy:
-			return -1
-		if self.__hash_value is None:
-			return 0
-		return 1
-
-	@property
-	def is_dummy(self):
-		''' Check if the entry is dummy '''
-		return self.__state == -1
-
-	@property
-	def is_filled(self):
-		''' Check if the entry is filled '''
-		return self.__state == 1
-
-	def is_empty(self):
-		''' Check if the entry is filled '''
-		return self.__state == 0
-
-	@property
-	def key(self):
-		''' Define key as a read-only attribute '''
-		return self.__key
-
-	@property
-	def value(self):
-		''' Define value as a read-only attribute '''
-		return self.__value
-
-	@property
-	def hash_value(self):
-		''' Define hash_value as a read-only attribute '''
-		return self.__hash_value
-
-	@property
-	def hash_str(self):
-		return 'None' if self.__hash_value is None else f"{self.__hash_value:#018x}"
-
-	def print(self, index):
-		''' Printing the entry'''
-		hash_str = None if self.__hash_value is None else f"{self.__hash_value:#018x}"
-		print(f"{index} {hash_str} {self.__key} {self.__value} {self.__dummy}")
-
-	def __get_hash(self, key):
-		''' Return the hash of the given key '''
-		hash_value = self.__siphash.get_hash(key)
-		if self.hash_compress_bits:
-			return self.__compress_hash(hash_value)
-		return hash_value
-
-	def __compress_hash(self, hash_value):
-		'''
-		Compress the hash value into a certain number of bits
-		This is used to increase chances of getting hash collisions for analysis purposes
-		'''
-		lower = (1 << self.hash_compress_bits) - 1
-		compressed_hash = 0
-		while hash_value:
-			compressed_hash ^= hash_value & lower
-			hash_value >>= self.hash_compress_bits
-		return compressed_hash
-
-
-class HashTable:
-	''' Class to create a hash table datastructure '''
-	load_factor = 1 # must be <= 1
-
-	def __init__(self, hash_key=None, verbose=False, collision_resolution='simple'):
-		self.__size = 8
-		self.__used = 0
-		self.__update_used = True
-		self.__verbose = verbose
-		self.__internal_list = self.__init_internal_list()
-		self.collision_counter = 0
-		self.__hash_key = hash_key
-		assert collision_resolution in ['simple', 'modified', 'pythonic']
-		if collision_resolution == 'simple':
-			self.__get_new_index = self.__simple_linear_probing
-		elif collision_resolution == 'modified':
-			self.__get_new_index = self.__modified_linear_probing
-		elif collision_resolution == 'pythonic':
-			self.__get_new_index = self.__pythonic_linear_probing
-		else:
-			assert False, f"Undefined collision resolution technique '{collision_resolution}'"
-
-	def get(self, key):
-		''' Getter function of a key '''
-		index = self.__lookup_key(key)
-		if self.__internal_list[index].is_filled:
-			return self.__internal_list[index].value
-		if self.__verbose:
-			print(f"Key '{key}' does not exist in hash table")
-		return None
-
-	def remove(self, key):
-		''' Deleter function to a key-value pair '''
-		index = self.__lookup_key(key)
-		if self.__internal_list[index].is_filled:
-			self.__internal_list[index].set_dummy()
-			self.__print_internal_list()
-		else:
-			if self.__verbose:
-				print(f"Key '{key}' does not exist in hash table")
-
-	def update(self, key, value):
-		''' Setter function for a key-value pair '''
-		if (self.__used + 1) / self.__size > self.load_factor:
-			self.__increment_size()
-		index = self.__lookup_key(key, skip_dummy=False)
-		if not self.__internal_list[index].is_dummy and self.__update_used:
-			self.__used += 1
-		self.__internal_list[index] = HashTableEntry(key=key, value=value)
-		self.__print_internal_list()
-
-	def keys(self):
-		''' Return the keys as a list '''
-		return self.__get_items()[0]
-
-	def values(self):
-		''' Return the values as a list '''
-		return self.__get_items()[1]
-
-	def items(self):
-		''' Return the keys and values as two combined lists '''
-		keys, values, _ = self.__get_items()
-		return zip(keys, values)
-
-	def __lookup_key(self, key, skip_dummy=True):
-		'''
-		Return the index at which key exists, or an empty index to enter key
-		skip_dummy should be True for getter and deleter functions, but False for setter
-		'''
-		entry = HashTableEntry(key=key)
-		hash_value = entry.hash_value
-		index = hash_value & (self.__size - 1) # initial index
-		while True:
-			if self.__internal_list[index].is_dummy:
-				if not skip_dummy:
-					return index
-			elif self.__internal_list[index].is_filled:
-				if entry == self.__internal_list[index]:
-					return index
-			else:
-				return index
-			self.__print_collision(index, key, entry.hash_value)
-			index, hash_value = self.__get_new_index(index, hash_value)
-			if self.__verbose:
-				hash_str = 'None' if hash_value is None else f"{hash_value:#018x}"
-				print(f"new index: {index}, new hash value: {hash_str}")
-
-	def __get_items(self):
-		''' Return keys, values and hashes as lists '''
-		keys, values, hashes = [], [], []
-		for entry in self.__internal_list:
-			if entry.is_filled:
-				hashes.append(entry.hash_value)
-				keys.append(entry.key)
-				values.append(entry.value)
-		return keys, values, hashes
-
-	def __init_internal_list(self):
-		''' Initializing the internal list with correct size '''
-		return [HashTableEntry()] * self.__size
-
-	def __print_internal_list(self):
-		''' Print the elements of the internal list '''
-		if not self.__verbose:
-			return
-		print('-'*18, 'internal list', '-'*17)
-		for index, entry in enumerate(self.__internal_list):
-			entry.print(index)
-		print('-' * 50)
-
-	def __print_collision(self, index, key, hash_value):
-		''' Print the details of the hash collision for analysis purposes '''
-		self.collision_counter += 1
-		if not self.__verbose:
-			return
-		old = self.__internal_list[index]
-		hash_str = None if hash_value is None else f"{hash_value:#018x}"
-		old_str = None if old.hash_value is None else f"{old.hash_value:#x}"
-		print(f"Found collision at index {index}, "
-				f"found key:'{old.key}' with hash:{old_str}, "
-				f"entered key:'{key}' with hash:{hash_str}")
-		# breakpoint()
-
-	def __increment_size(self):
-		''' Doubling the size of the hash table (internal list) '''
-		verbose = self.__verbose
-		self.__verbose = False
-		self.__update_used = False
-		if verbose:
-			print(f"Resizing the intenal list from {self.__size} to {self.__size << 1}")
-		self.__size <<= 1
-		items = self.items()
-		self.__internal_list = self.__init_internal_list()
-		for key, value in items:
-			self.update(key, value)
-		self.__verbose = verbose
-		self.__print_internal_list()
-		self.__update_used = True
-
-	def __simple_linear_probing(self, prev_index, hash_value):
-		''' New index = previous index + 1 (mod size) '''
-		return (prev_index + 1) & (self.__size - 1), hash_value
-
-	def __modified_linear_probing(self, prev_index, hash_value):
-		''' New index = 5 x previous index + 1 (mod size) '''
-		return (5 * prev_index + 1) & (self.__size - 1), hash_value
-
-	def __pythonic_linear_probing(self, prev_index, hash_value):
-		''' New index = 5 x previous index + 1 + hash value (mod size) '''
-		return (5 * prev_index + 1 + hash_value) & (self.__size - 1), hash_value >> 5
-
-if __name__ == '__main__':
-	average_simple = 0
-	average_modified = 0
-	average_pythonic = 0
-	n, m = 100, 100
-	for _ in range(n):
-		secret_key = random.getrandbits(128)
-		squares_simple = HashTable(hash_key=secret_key, verbose=False, collision_resolution='simple')
-		squares_modified = HashTable(hash_key=secret_key, verbose=False, collision_resolution='modified')
-		squares_pythonic = HashTable(hash_key=secret_key, verbose=False, collision_resolution='pythonic')
-		for i in range(m):
-			squares_simple.update(i, i*i)
-			squares_modified.update(i, i*i)
-			squares_pythonic.update(i, i*i)
-		average_simple += squares_simple.collision_counter
-		average_modified += squares_modified.collision_counter
-		average_pythonic += squares_pythonic.collision_counter
-	average_simple /= n
-	average_modified /= n
-	average_pythonic /= n
-	print(f"Average collisions using simple collision resolution technique for {m} keys over {n} iterations: {average_simple}")
-	print(f"Average collisions using modified collision resolution technique for {m} keys over {n} iterations: {average_modified}")
-	print(f"Average collisions using pythonic collision resolution technique for {m} keys over {n} iterations: {average_pythonic}")
+import random
+import numpy as np
+from siphash import SipHash, int2bytes, print_hex
+
+class HashTableEntry:
+	''' Class to represent a single key-value pair and compute its hash '''
+	# no per-instance __dict__: entries only ever hold these four attributes
+	__slots__ = ('__key', '__value', '__hash_value', 'state')
+	__siphash = SipHash(allow_negative=True, secret_key=None)
+	hash_compress_bits = 0
+	__compress_functions = {} # unrolled XOR-folds memoized by bit width
+
+	def __init__(self, key=None, value=None, hash_value=None):
+		self.__key = key
+		self.__value = value
+		if hash_value is None:
+			hash_value = None if key is None else self.__get_hash(key)
+		self.__hash_value = hash_value
+		# state of the entry as a plain integer (-1: dummy, 0: empty, 1: filled)
+		# so checking it is a single attribute load instead of property calls
+		self.state = 0 if hash_value is None else 1
+
+	def set_dummy(self):
+		''' Set the entry to dummy to indicate it is deleted from the hash table '''
+		self.state = -1
+
+	@property
+	def key(self):
+		''' Define key as a read-only attribute '''
+		return self.__key
+
+	@property
+	def value(self):
+		''' Define value as a read-only attribute '''
+		return self.__value
+
+	@property
+	def hash_value(self):
+		''' Define hash_value as a read-only attribute '''
+		return self.__hash_value
+
+	@property
+	def hash_str(self):
+		return 'None' if self.__hash_value is None else f"{self.__hash_value:#018x}"
+
+	def print(self, index):
+		''' Printing the entry'''
+		hash_str = None if self.__hash_value is None else f"{self.__hash_value:#018x}"
+		print(f"{index} {hash_str} {self.__key} {self.__value} {self.state == -1}")
+
+	@classmethod
+	def get_hash_int64_many(cls, keys):
+		''' Batch-hash small non-negative integer keys with the shared SipHash '''
+		return cls.__siphash.get_hash_int64_many(keys)
+
+	@classmethod
+	def get_key_hash(cls, key):
+		''' Hash a key with the shared SipHash, no entry object required '''
+		if isinstance(key, int) and 0 <= key < (1 << 56):
+			hash_value = cls.__siphash.get_hash_int64(key)
+		else:
+			hash_value = cls.__siphash.get_hash(key)
+		if cls.hash_compress_bits:
+			return cls.__compress_hash(hash_value)
+		return hash_value
+
+	def __get_hash(self, key):
+		''' Return the hash of the given key '''
+		return self.get_key_hash(key)
+
+	@classmethod
+	def __compress_hash(cls, hash_value):
+		'''
+		Compress the hash value into a certain number of bits
+		This is used to increase chances of getting hash collisions for analysis purposes
+		'''
+		bits = cls.hash_compress_bits
+		compress = cls.__compress_functions.get(bits)
+		if compress is None:
+			compress = cls.__compress_functions[bits] = cls.__build_compress_function(bits)
+		return compress(hash_value)
+
+	@staticmethod
+	def __build_compress_function(bits):
+		'''
+		Build a straight-line XOR-fold of a 64-bit hash into the given width
+		The interpreted loop is constant for a given bit width, so it is
+		unrolled once into a lambda and memoized in __compress_functions
+		'''
+		terms = ' ^ '.join(f'(hash_value >> {shift})' for shift in range(0, 64, bits))
+		return eval(f'lambda hash_value: ({terms}) & {(1 << bits) - 1}')
+
+
+class XXHash64:
+	'''
+	Thin adapter exposing the SipHash hashing interface on top of xxh64
+	xxh64 is not resistant to hash flooding but is much faster per key,
+	which is enough for workloads that do not face adversarial inputs
+	'''
+	def __init__(self, seed=0):
+		# imported here so the xxhash package is only required when used
+		import xxhash
+		self.__intdigest = xxhash.xxh64_intdigest
+		self.__seed = seed & ((1 << 64) - 1)
+
+	def get_hash(self, input_msg):
+		''' Hashing the input message '''
+		if isinstance(input_msg, str):
+			msg_bytes = input_msg.encode('utf-8')
+		elif isinstance(input_msg, int):
+			msg_bytes = int2bytes(input_msg)
+		else:
+			# If input is neither integer nor string, apply the hash to the id
+			msg_bytes = int2bytes(id(input_msg))
+		return self.__intdigest(msg_bytes, seed=self.__seed)
+
+
+class HashTable:
+	'''
+	Class to create a hash table datastructure
+	Entries are stored in parallel arrays (hashes, states, keys, values)
+	rather than a list of HashTableEntry objects, so a probe step only
+	touches flat array slots instead of chasing entry attributes
+	'''
+	load_factor = 1 # must be <= 1
+	# probe depth at which hybrid collision resolution stops probing linearly
+	hybrid_depth_threshold = 20
+	# slot states stored in the internal state array
+	EMPTY = 0
+	FILLED = 1
+	DUMMY = 2
+	# tags hold the top 7 hash bits with the high bit set, so 0/1 never
+	# collide with a filled slot and a whole group can be scanned at once
+	TAG_EMPTY = 0
+	TAG_DUMMY = 1
+	GROUP_SIZE = 16
+
+	def __init__(self, hash_key=None, verbose=False, collision_resolution='simple', hash_algo='siphash', initial_size=8):
+		self.__size = self.__next_power_of_two(max(8, initial_size))
+		self.__used = 0
+		self.__update_used = True
+		self.__verbose = verbose
+		self.__init_internal_arrays()
+		self.collision_counter = 0
+		self.__hash_key = hash_key
+		assert hash_algo in ['siphash', 'xxh64']
+		# siphash keeps its flooding resistance and the compression knob for
+		# the collision experiments; xxh64 trades that for per-key speed
+		self.__hasher = None if hash_algo == 'siphash' else XXHash64(seed=hash_key or 0)
+		# only plain linear probing walks consecutive slots, which is what
+		# the grouped tag scan in __lookup_key_grouped relies on
+		self.__grouped_probe = collision_resolution == 'simple'
+		# robin hood keeps per-slot displacements and its own insert/remove paths
+		self.__robinhood = collision_resolution == 'robinhood'
+		assert collision_resolution in ['simple', 'modified', 'pythonic', 'hybrid', 'robinhood']
+		if collision_resolution in ['simple', 'robinhood']:
+			self.__get_new_index = self.__simple_linear_probing
+		elif collision_resolution == 'modified':
+			self.__get_new_index = self.__modified_linear_probing
+		elif collision_resolution == 'pythonic':
+			self.__get_new_index = self.__pythonic_linear_probing
+		elif collision_resolution == 'hybrid':
+			self.__get_new_index = self.__hybrid_probing
+		else:
+			assert False, f"Undefined collision resolution technique '{collision_resolution}'"
+
+	def get(self, key):
+		''' Getter function of a key '''
+		index = self.__lookup_key(key)
+		if index >= 0 and self.__states[index] == self.FILLED:
+			return self.__values[index]
+		if self.__verbose:
+			print(f"Key '{key}' does not exist in hash table")
+		return None
+
+	def remove(self, key):
+		''' Deleter function to a key-value pair '''
+		if self.__robinhood:
+			self.__remove_robinhood(key)
+			return
+		index = self.__lookup_key(key)
+		if self.__states[index] == self.FILLED:
+			self.__states[index] = self.DUMMY
+			self.__tags[index] = self.TAG_DUMMY
+			self.__keys[index] = None
+			self.__values[index] = None
+			self.__print_internal_list()
+		else:
+			if self.__verbose:
+				print(f"Key '{key}' does not exist in hash table")
+
+	def update(self, key, value):
+		''' Setter function for a key-value pair '''
+		if (self.__used + 1) / self.__size > self.load_factor:
+			self.__increment_size()
+		self.__insert_with_hash(key, value)
+
+	def reserve(self, expected_size):
+		'''
+		Grow the table once so expected_size items fit without further resizing
+		Useful when the number of insertions is known up front, since each
+		resize rehashes and reinserts every stored item
+		'''
+		target = self.__next_power_of_two(int(expected_size / self.load_factor) + 1)
+		if target > self.__size:
+			self.__resize(target)
+
+	@staticmethod
+	def __next_power_of_two(number):
+		''' Round a positive integer up to the next power of two '''
+		return 1 << (number - 1).bit_length()
+
+	def update_many(self, keys, values):
+		'''
+		Setter function for many key-value pairs at once
+		The table grows at most once to fit the whole batch and the key
+		hashes are computed in a single pass before inserting
+		'''
+		keys, values = list(keys), list(values)
+		assert len(keys) == len(values)
+		new_size = self.__size
+		while (self.__used + len(keys)) / new_size > self.load_factor:
+			new_size <<= 1
+		if new_size != self.__size:
+			self.__resize(new_size)
+		for key, value, hash_value in zip(keys, values, self.__get_hash_many(keys)):
+			self.__insert_with_hash(key, value, hash_value)
+
+	def __insert_with_hash(self, key, value, hash_value=None):
+		''' Insert a key-value pair, hashing the key only if no cached hash is given '''
+		if hash_value is None:
+			hash_value = self.__get_hash(key)
+		if self.__robinhood:
+			self.__insert_robinhood(key, value, hash_value)
+			return
+		index = self.__lookup_key(key, hash_value=hash_value, skip_dummy=False)
+		if self.__states[index] != self.DUMMY and self.__update_used:
+			self.__used += 1
+		self.__states[index] = self.FILLED
+		self.__tags[index] = self.__hash_tag(hash_value)
+		self.__hashes[index] = hash_value
+		self.__keys[index] = key
+		self.__values[index] = value
+		self.__print_internal_list()
+
+	def keys(self):
+		''' Iterate over the keys of the filled slots '''
+		return (self.__keys[index] for index in np.nonzero(self.__states == self.FILLED)[0])
+
+	def values(self):
+		''' Iterate over the values of the filled slots '''
+		return (self.__values[index] for index in np.nonzero(self.__states == self.FILLED)[0])
+
+	def items(self):
+		''' Iterate over the key-value pairs of the filled slots '''
+		return ((self.__keys[index], self.__values[index])
+				for index in np.nonzero(self.__states == self.FILLED)[0])
+
+	def __lookup_key(self, key, hash_value=None, skip_dummy=True):
+		'''
+		Return the index at which key exists, or an empty index to enter key
+		hash_value is the cached hash of the key, computed here only when not given
+		skip_dummy should be True for getter and deleter functions, but False for setter
+		In robinhood mode a definite miss returns -1 instead of a slot index
+		'''
+		if hash_value is None:
+			hash_value = self.__get_hash(key)
+		if self.__robinhood:
+			return self.__lookup_key_robinhood(key, hash_value)
+		if self.__grouped_probe and self.__size >= self.GROUP_SIZE and not self.__verbose:
+			return self.__lookup_key_grouped(key, hash_value, skip_dummy)
+		index = hash_value & self.__mask # initial index
+		probe_value = hash_value # perturbed by some probing techniques
+		probe_depth = 0
+		while True:
+			state = self.__states[index]
+			if state == self.DUMMY:
+				if not skip_dummy:
+					return index
+			elif state == self.FILLED:
+				if self.__hashes[index] == hash_value and self.__keys[index] == key:
+					return index
+			else:
+				return index
+			self.__print_collision(index, key, hash_value)
+			index, probe_value = self.__get_new_index(index, probe_value, probe_depth)
+			probe_depth += 1
+			if self.__verbose:
+				hash_str = 'None' if probe_value is None else f"{probe_value:#018x}"
+				print(f"new index: {index}, new hash value: {hash_str}")
+
+	def __get_hash(self, key):
+		''' Hash a key with the hashing algorithm configured for this table '''
+		if self.__hasher is None:
+			return HashTableEntry.get_key_hash(key)
+		return self.__hasher.get_hash(key)
+
+	def __get_hash_many(self, keys):
+		''' Hash a batch of keys, in one jitted pass when they are all small integers '''
+		batchable = self.__hasher is None and not HashTableEntry.hash_compress_bits
+		if batchable and all(isinstance(key, int) and 0 <= key < (1 << 56) for key in keys):
+			return HashTableEntry.get_hash_int64_many(keys)
+		return [self.__get_hash(key) for key in keys]
+
+	@classmethod
+	def __hash_tag(cls, hash_value):
+		''' Tag byte of a hash: its top 7 bits with the high bit set '''
+		return ((hash_value >> 57) & 0x7F) | 0x80
+
+	def __lookup_key_grouped(self, key, hash_value, skip_dummy):
+		'''
+		Linear-probing variant of __lookup_key that scans GROUP_SIZE tags
+		per step with vectorized compares instead of one slot per iteration
+		Candidate slots whose tag matches are verified against the full
+		hash and key; the first empty (or dummy, for setters) tag ends the
+		probe chain. The collision counter advances by the number of slots
+		stepped over, matching the scalar probe loop
+		'''
+		mask = self.__mask
+		tag = self.__hash_tag(hash_value)
+		index = hash_value & mask # initial index
+		base = index & ~(self.GROUP_SIZE - 1)
+		offset = index - base
+		steps = 0 # slots stepped over in previous groups
+		while True:
+			group = self.__tags[base:base + self.GROUP_SIZE]
+			stop_mask = group == self.TAG_EMPTY
+			if not skip_dummy:
+				stop_mask |= group == self.TAG_DUMMY
+			stops = np.nonzero(stop_mask)[0]
+			stops = stops[stops >= offset]
+			stop = int(stops[0]) if stops.size else self.GROUP_SIZE
+			for pos in np.nonzero(group == tag)[0]:
+				if pos < offset or pos >= stop:
+					continue
+				slot = base + int(pos)
+				if self.__hashes[slot] == hash_value and self.__keys[slot] == key:
+					self.collision_counter += steps + int(pos) - offset
+					return slot
+			if stop < self.GROUP_SIZE:
+				self.collision_counter += steps + stop - offset
+				return base + stop
+			steps += self.GROUP_SIZE - offset
+			base = (base + self.GROUP_SIZE) & mask
+			offset = 0
+
+	def __lookup_key_robinhood(self, key, hash_value):
+		'''
+		Probe for a key stored with robin hood displacements
+		A filled slot closer to its ideal slot than the current probe
+		distance proves the key is absent (insertion would have stolen that
+		slot), so misses stop early instead of walking the whole cluster
+		Returns -1 for a definite miss
+		'''
+		mask = self.__mask
+		index = hash_value & mask # initial index
+		distance = 0
+		while True:
+			state = self.__states[index]
+			if state == self.EMPTY:
+				return -1
+			if self.__dists[index] < distance:
+				return -1
+			if self.__hashes[index] == hash_value and self.__keys[index] == key:
+				return index
+			self.__print_collision(index, key, hash_value)
+			index = (index + 1) & mask
+			distance += 1
+
+	def __insert_robinhood(self, key, value, hash_value):
+		'''
+		Linear-probing insert that keeps displacements balanced: whenever the
+		carried item is further from its ideal slot than the resident one, the
+		resident is evicted and carried onward instead (the robin hood steal)
+		'''
+		mask = self.__mask
+		index = hash_value & mask # initial index
+		distance = 0
+		tag = self.__hash_tag(hash_value)
+		displaced = False # whether the carried item is an evicted resident
+		if self.__update_used:
+			self.__used += 1
+		while True:
+			state = self.__states[index]
+			if state != self.FILLED:
+				break
+			if not displaced and self.__hashes[index] == hash_value and self.__keys[index] == key:
+				self.__values[index] = value
+				self.__print_internal_list()
+				return
+			if self.__dists[index] < distance:
+				# steal the slot and carry the evicted resident onward
+				key, self.__keys[index] = self.__keys[index], key
+				value, self.__values[index] = self.__values[index], value
+				hash_value, self.__hashes[index] = int(self.__hashes[index]), hash_value
+				tag, self.__tags[index] = int(self.__tags[index]), tag
+				distance, self.__dists[index] = int(self.__dists[index]), distance
+				displaced = True
+			self.__print_collision(index, key, hash_value)
+			index = (index + 1) & mask
+			distance += 1
+		self.__states[index] = self.FILLED
+		self.__tags[index] = tag
+		self.__hashes[index] = hash_value
+		self.__keys[index] = key
+		self.__values[index] = value
+		self.__dists[index] = distance
+		self.__print_internal_list()
+
+	def __remove_robinhood(self, key):
+		'''
+		Deleter for robinhood mode: instead of leaving a dummy slot, shift the
+		rest of the cluster back one slot so displacement invariants hold
+		'''
+		index = self.__lookup_key(key)
+		if index < 0:
+			if self.__verbose:
+				print(f"Key '{key}' does not exist in hash table")
+			return
+		mask = self.__mask
+		next_index = (index + 1) & mask
+		while self.__states[next_index] == self.FILLED and self.__dists[next_index] > 0:
+			self.__hashes[index] = self.__hashes[next_index]
+			self.__tags[index] = self.__tags[next_index]
+			self.__keys[index] = self.__keys[next_index]
+			self.__values[index] = self.__values[next_index]
+			self.__dists[index] = self.__dists[next_index] - 1
+			index = next_index
+			next_index = (next_index + 1) & mask
+		self.__states[index] = self.EMPTY
+		self.__tags[index] = self.TAG_EMPTY
+		self.__hashes[index] = 0
+		self.__keys[index] = None
+		self.__values[index] = None
+		self.__dists[index] = 0
+		self.__used -= 1
+		self.__print_internal_list()
+
+	def __get_items(self):
+		''' Return keys, values and hashes as lists '''
+		keys, values, hashes = [], [], []
+		for index in np.nonzero(self.__states == self.FILLED)[0]:
+			hashes.append(int(self.__hashes[index]))
+			keys.append(self.__keys[index])
+			values.append(self.__values[index])
+		return keys, values, hashes
+
+	def __init_internal_arrays(self):
+		''' Initializing the parallel internal arrays with correct size '''
+		# index mask, recomputed only when the table changes size
+		self.__mask = self.__size - 1
+		self.__hashes = np.zeros(self.__size, dtype=np.uint64)
+		self.__states = np.zeros(self.__size, dtype=np.uint8)
+		self.__tags = np.zeros(self.__size, dtype=np.uint8)
+		# displacement from the ideal slot, maintained in robinhood mode only
+		self.__dists = np.zeros(self.__size, dtype=np.uint16)
+		self.__keys = np.empty(self.__size, dtype=object)
+		self.__values = np.empty(self.__size, dtype=object)
+
+	def __print_internal_list(self):
+		''' Print the elements of the internal arrays '''
+		if not self.__verbose:
+			return
+		print('-'*18, 'internal list', '-'*17)
+		for index in range(self.__size):
+			state = self.__states[index]
+			hash_str = None if state == self.EMPTY else f"{int(self.__hashes[index]):#018x}"
+			print(f"{index} {hash_str} {self.__keys[index]} {self.__values[index]} {state == self.DUMMY}")
+		print('-' * 50)
+
+	def __print_collision(self, index, key, hash_value):
+		''' Print the details of the hash collision for analysis purposes '''
+		self.collision_counter += 1
+		if not self.__verbose:
+			return
+		hash_str = None if hash_value is None else f"{hash_value:#018x}"
+		old_str = None if self.__states[index] == self.EMPTY else f"{int(self.__hashes[index]):#x}"
+		print(f"Found collision at index {index}, "
+				f"found key:'{self.__keys[index]}' with hash:{old_str}, "
+				f"entered key:'{key}' with hash:{hash_str}")
+		# breakpoint()
+
+	def __increment_size(self):
+		''' Doubling the size of the hash table (internal arrays) '''
+		self.__resize(self.__size << 1)
+
+	def __resize(self, new_size):
+		''' Rebuild the internal arrays at new_size and reinsert every item '''
+		verbose = self.__verbose
+		self.__verbose = False
+		self.__update_used = False
+		if verbose:
+			print(f"Resizing the intenal list from {self.__size} to {new_size}")
+		keys, values, hashes = self.__get_items()
+		self.__size = new_size
+		self.__init_internal_arrays()
+		for key, value, hash_value in zip(keys, values, hashes):
+			self.__insert_with_hash(key, value, hash_value)
+		self.__verbose = verbose
+		self.__print_internal_list()
+		self.__update_used = True
+
+	def __simple_linear_probing(self, prev_index, hash_value, probe_depth):
+		''' New index = previous index + 1 (mod size) '''
+		return (prev_index + 1) & self.__mask, hash_value
+
+	def __modified_linear_probing(self, prev_index, hash_value, probe_depth):
+		''' New index = 5 x previous index + 1 (mod size) '''
+		return (5 * prev_index + 1) & self.__mask, hash_value
+
+	def __pythonic_linear_probing(self, prev_index, hash_value, probe_depth):
+		''' New index = 5 x previous index + 1 + hash value (mod size) '''
+		return (5 * prev_index + 1 + hash_value) & self.__mask, hash_value >> 5
+
+	def __hybrid_probing(self, prev_index, hash_value, probe_depth):
+		'''
+		Linear probing while the probe chain is short, pythonic probing beyond
+		hybrid_depth_threshold, keeping cache locality for the common case
+		while breaking up clusters that grow past the threshold
+		'''
+		if probe_depth < self.hybrid_depth_threshold:
+			return self.__simple_linear_probing(prev_index, hash_value, probe_depth)
+		return self.__pythonic_linear_probing(prev_index, hash_value, probe_depth)
+
+def run_trial(collision_resolution, secret_key, keys, values):
+	''' Fill a fresh hash table with the key-value pairs and return its collision count '''
+	squares = HashTable(hash_key=secret_key, verbose=False, collision_resolution=collision_resolution, initial_size=256)
+	squares.update_many(keys, values)
+	return squares.collision_counter
+
+if __name__ == '__main__':
+	from concurrent.futures import ProcessPoolExecutor
+	schemes = ['simple', 'modified', 'pythonic']
+	n, m = 100, 100
+	keys = list(range(m))
+	values = [i*i for i in keys]
+	secret_keys = [random.getrandbits(128) for _ in range(n)]
+	# the three schemes fill independent tables, so run them on separate cores
+	with ProcessPoolExecutor(max_workers=len(schemes)) as executor:
+		futures = {scheme: [executor.submit(run_trial, scheme, secret_key, keys, values)
+				for secret_key in secret_keys] for scheme in schemes}
+		for scheme in schemes:
+			average = sum(future.result() for future in futures[scheme]) / n
+			print(f"Average collisions using {scheme} collision resolution technique "
+					f"for {m} keys over {n} iterations: {average}")